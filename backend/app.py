@@ -1,59 +1,94 @@
 import os
 import sys
+import hashlib
 import logging
 
-from flask import Flask, send_from_directory
+from flask import Flask, Response, abort, request, send_file
 from flask_cors import CORS
+from werkzeug.security import safe_join
 
-# Add parent directory to path so all modules can be imported
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from backend.config import DEBUG, HOST, PORT, CORS_ORIGINS, LOG_LEVEL, LOG_FORMAT
-from backend.routes import api_bp
-from database.db_connection import init_database, check_database
+from backend.json_provider import ORJSONProvider
+from backend.config import (
+    DEBUG, HOST, PORT, SERVER_THREADS, CORS_ORIGINS, CORS_MAX_AGE, LOG_LEVEL, LOG_FORMAT,
+    FRONTEND_DIR, USE_X_SENDFILE, STATIC_MAX_AGE
+)
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, LOG_LEVEL), format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 
+def _load_shell_page(filename):
+    """Read a frontend shell page into memory along with its ETag"""
+    with open(os.path.join(FRONTEND_DIR, filename), 'rb') as f:
+        body = f.read()
+    return body, hashlib.md5(body).hexdigest()
+
+
 def create_app():
     """Application factory"""
-    app = Flask(
-        __name__,
-        static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'frontend'),
-        static_url_path=''
+    # No built-in static route: it would shadow serve_frontend's /<path:path> rule
+    app = Flask(__name__, static_folder=None)
+    app.config['USE_X_SENDFILE'] = USE_X_SENDFILE
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+    # jsonify() serializes through orjson
+    app.json = ORJSONProvider(app)
+
+    # Shell pages only change on deploy, so keep them in memory (re-read while debugging)
+    shell_pages = {name: _load_shell_page(name) for name in ('index.html', 'dashboard.html')}
+
+    def shell_response(filename):
+        body, etag = _load_shell_page(filename) if DEBUG else shell_pages[filename]
+        response = Response(body, mimetype='text/html', headers={'Cache-Control': 'no-cache'})
+        response.set_etag(etag)
+        return response.make_conditional(request)
+
+    # Configure CORS - echo the exact allowed origin (with Vary: Origin) and cache preflights
+    CORS(
+        app,
+        resources={r"/api/*": {"origins": CORS_ORIGINS}},
+        supports_credentials=True,
+        max_age=CORS_MAX_AGE
     )
 
-    # Configure CORS - allow all origins for development
-    CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
-
-    # Register blueprints
+    # Register blueprints (imported here so the service/DB stack loads with the app)
+    from backend.routes import api_bp, cache
     app.register_blueprint(api_bp)
+    cache.init_app(app)
+
+    # Connections are per thread and outlive the request; only reset their state
+    from database.db_connection import release_read_connection
+
+    @app.teardown_appcontext
+    def release_db(exc):
+        release_read_connection()
 
     # Serve index.html at root
     @app.route('/')
     def serve_index():
-        return send_from_directory(app.static_folder, 'index.html')
+        return shell_response('index.html')
 
     # Serve dashboard
     @app.route('/dashboard')
     def serve_dashboard():
-        return send_from_directory(app.static_folder, 'dashboard.html')
+        return shell_response('dashboard.html')
 
-    # Catch-all: serve any other frontend file
+    # Catch-all: serve any other frontend file, falling back to index.html
     @app.route('/<path:path>')
     def serve_frontend(path):
-        try:
-            return send_from_directory(app.static_folder, path)
-        except Exception:
-            return send_from_directory(app.static_folder, 'index.html')
+        if path.startswith('api/'):
+            abort(404)
+        full_path = safe_join(FRONTEND_DIR, path)
+        if full_path and os.path.isfile(full_path):
+            return send_file(full_path, conditional=True)
+        return shell_response('index.html')
 
     return app
 
 
 def initialize_database():
     """Initialize database if it doesn't exist"""
+    from database.db_connection import init_database, check_database
     try:
         if not check_database():
             logger.info("Database not found. Initializing...")
@@ -63,19 +98,41 @@ def initialize_database():
             seed_database()
             logger.info("Database initialized and seeded successfully")
         else:
+            # Schema statements are idempotent; re-apply them to pick up new indexes
+            init_database()
             logger.info("Database already exists")
+
+        # Rows from databases created before the category column existed carry no category yet
+        from backend.inventory_service import InventoryService
+        InventoryService.backfill_categories()
     except Exception as e:
-        logger.error(f"Error initializing database: {e}")
+        logger.error("Error initializing database: %s", e)
         sys.exit(1)
 
 
-if __name__ == '__main__':
+def run_server(app):
+    """Run the Flask dev server when debugging, otherwise the waitress WSGI server"""
+    if DEBUG:
+        app.run(debug=True, host=HOST, port=PORT)
+    else:
+        # waitress serves requests from a thread pool and streams send_file
+        # responses through its wsgi.file_wrapper
+        from waitress import serve
+        serve(app, host=HOST, port=PORT, threads=SERVER_THREADS)
+
+
+def main():
+    """Entry point for python -m backend.app, run from the project root"""
     # Initialize database
     initialize_database()
 
     # Create and run app
     app = create_app()
-    logger.info(f"Starting Voice Inventory Agent on {HOST}:{PORT}")
-    logger.info(f"API: http://{HOST}:{PORT}/api")
-    logger.info(f"Frontend: http://{HOST}:{PORT}")
-    app.run(debug=DEBUG, host=HOST, port=PORT)
+    logger.info("Starting Voice Inventory Agent on %s:%s", HOST, PORT)
+    logger.info("API: http://%s:%s/api", HOST, PORT)
+    logger.info("Frontend: http://%s:%s", HOST, PORT)
+    run_server(app)
+
+
+if __name__ == '__main__':
+    main()
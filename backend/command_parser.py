@@ -1,160 +1,310 @@
 import re
 import logging
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
 
-from shared.constants import ACTIONS, ACTION_KEYWORDS, STOP_WORDS
+from shared.constants import ACTIONS, ACTION_KEYWORDS, ALL_STOP_WORDS, STOP_WORDS, UNIT_WORDS
 from shared.models import ParsedCommand
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-class CommandParser:
-    """Parse natural language commands in multiple languages into structured data"""
-
-    @staticmethod
-    def parse(text: str) -> Optional[ParsedCommand]:
-        """
-        Parse a text command into action, item, and quantity.
-        Returns ParsedCommand object or None if parsing fails.
-        Supports English, Telugu, and Hindi.
-        """
-        if not text or not text.strip():
-            return None
+# Merged multilingual lookups, built once
+_ALL_UNIT_WORDS = frozenset(word.lower() for words in UNIT_WORDS.values() for word in words)
+
+
+def _build_keyword_to_action() -> Dict[str, str]:
+    """Invert ACTION_KEYWORDS so a word maps straight to its action"""
+    keyword_to_action = {}
+    for action_type, keywords in ACTION_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_to_action.setdefault(keyword.lower(), action_type)
+    return keyword_to_action
+
+
+_KEYWORD_TO_ACTION = MappingProxyType(_build_keyword_to_action())
+
+
+# Letters of a single word (English, Telugu, Devanagari)
+_LETTERS = r'[\u0C00-\u0C7F\u0900-\u097Fa-z]'
+
+
+def _atomic_word(name: str) -> str:
+    """
+    Match one whole word without allowing backtracking into it.
+    Python's re has no atomic groups, so capture inside a lookahead and
+    consume the capture with a backreference.
+    """
+    return rf'(?=(?P<{name}>{_LETTERS}+))(?P={name})'
+
+
+def _alternation(words) -> str:
+    """Regex alternation of literal words, longest first"""
+    # Ties are broken alphabetically so the pattern does not depend on set order
+    return '|'.join(re.escape(w) for w in sorted(words, key=lambda w: (-len(w), w)))
+
+
+def _build_structured_patterns():
+    """Compile pattern1/pattern2 for each structured action once at import"""
+    unit_pattern = _alternation({u for units in UNIT_WORDS.values() for u in units})
+    # Item words never include an action keyword, so a second keyword cannot be
+    # swallowed into the item name ("add 10 rice add", "10 rice add remove")
+    any_keyword = _alternation({k for keywords in ACTION_KEYWORDS.values() for k in keywords})
+    not_keyword = rf'(?!(?:{any_keyword})(?!{_LETTERS}))'
+    # Words are separated by whitespace, so each word can only be split one way
+    item_pattern = (
+        rf'{not_keyword}{_atomic_word("first")}(?:\s+{not_keyword}{_atomic_word("rest")})*'
+    )
+
+    # Commands are lowercased before matching, so no re.IGNORECASE
+    patterns = {}
+    for action_type in ['add', 'remove']:
+        keyword_pattern = _alternation(ACTION_KEYWORDS[action_type])
+        # Pattern: [quantity] [units] [item] [action] OR [action] [quantity] [units] [item]
+        pattern1 = re.compile(
+            rf'^(?P<quantity>\d+)\s*(?:(?:{unit_pattern})\s+)?'
+            rf'(?P<item>{item_pattern}?)\s+(?:{keyword_pattern})(?:\s+(?:{keyword_pattern}))*\s*$'
+        )
+        pattern2 = re.compile(
+            rf'^(?:{keyword_pattern})\s+(?P<quantity>\d+)\s*(?:(?:{unit_pattern})\s+)?'
+            rf'(?P<item>{item_pattern})(?:\s+(?:{keyword_pattern}))*\s*$'
+        )
+        patterns[action_type] = (pattern1, pattern2)
+    return patterns
+
+
+_STRUCTURED_PATTERNS = _build_structured_patterns()
+
+
+def _build_token_classes() -> Dict[str, Tuple[str, Optional[str]]]:
+    """Map every known single-word token to its class: stop, unit or action"""
+    token_classes = {}
+    for words in STOP_WORDS.values():
+        for word in words:
+            token_classes[word.lower()] = ('stop', None)
+    for words in UNIT_WORDS.values():
+        for word in words:
+            token_classes[word.lower()] = ('unit', None)
+    for action_type, keywords in ACTION_KEYWORDS.items():
+        for keyword in keywords:
+            # Multi-word keywords ("ले लो") are left to the regex patterns
+            if ' ' not in keyword:
+                token_classes[keyword.lower()] = ('action', action_type)
+    return token_classes
+
+
+_TOKEN_CLASS = MappingProxyType(_build_token_classes())
+_STRUCTURED_ACTIONS = frozenset(_STRUCTURED_PATTERNS)
+_MAX_KEYWORD_WORDS = max(len(k.split()) for k in _KEYWORD_TO_ACTION)
+_ITEM_TOKENS = frozenset(['word', 'stop', 'unit'])
+
+
+def _parse(text: str) -> Optional[ParsedCommand]:
+    """
+    Parse a text command into action, item, and quantity.
+    Returns ParsedCommand object or None if parsing fails.
+    Supports English, Telugu, and Hindi.
+    """
+    if not text or not text.strip():
+        return None
+
+    text = text.strip().lower()
+    logger.info("Parsing command: %s", text)
+
+    # Try the token scanner first, then the structured patterns
+    parsed = _tokenized_parse(text) or _try_structured_parse(text)
+    if parsed:
+        return parsed
+
+    # Fall back to flexible parsing
+    return _flexible_parse(text)
+
+
+def _contains_phrase_keyword(words) -> bool:
+    """True if a multi-word action keyword ("ले लो") appears among words"""
+    for count in range(2, _MAX_KEYWORD_WORDS + 1):
+        for start in range(len(words) - count + 1):
+            if ' '.join(words[start:start + count]) in _KEYWORD_TO_ACTION:
+                return True
+    return False
+
+
+def _tokenized_parse(text: str) -> Optional[ParsedCommand]:
+    """
+    Parse "[quantity] [unit] [item] [action]" or "[action] [quantity] [unit] [item]"
+    in a single pass over whitespace-separated tokens.
+    Returns None when the command has any other shape.
+    """
+    words = text.split()
+    tokens = [
+        ('num', int(word)) if word.isdecimal() else _TOKEN_CLASS.get(word, ('word', word))
+        for word in words
+    ]
+    if len(tokens) < 3:
+        return None
+
+    first_kind, first_value = tokens[0]
+    if first_kind == 'num':
+        quantity, action, start = first_value, None, 1
+    elif first_kind == 'action' and first_value in _STRUCTURED_ACTIONS and tokens[1][0] == 'num':
+        quantity, action, start = tokens[1][1], first_value, 2
+    else:
+        return None
 
-        text = text.strip().lower()
-        logger.info(f"Parsing command: {text}")
-
-        # Try structured patterns first
-        parsed = CommandParser._try_structured_parse(text)
-        if parsed:
-            return parsed
-
-        # Fall back to flexible parsing
-        return CommandParser._flexible_parse(text)
-
-    @staticmethod
-    def _try_structured_parse(text: str) -> Optional[ParsedCommand]:
-        """Try to parse using strict patterns for multilingual support"""
-
-        # Pattern 1: "add 10 rice" or "10 బిస్కెట్లు ఆడ్ చెయ్" or "10 पैकेट जोड़ो"
-        for action_type in ['add', 'remove', 'update']:
-            keywords = ACTION_KEYWORDS[action_type]
-            # Build regex pattern from keywords
-            keyword_pattern = '|'.join([re.escape(k) for k in keywords])
-            
-            if action_type in ['add', 'remove']:
-                # Pattern: [quantity] [units] [item] [action] OR [action] [quantity] [units] [item]
-                pattern1 = rf'(\d+)\s*(?:[\u0C00-\u0C7F\u0900-\u097Fa-z]+?\s+)?([\u0C00-\u0C7F\u0900-\u097Fa-z\s]+?)\s*({keyword_pattern})'
-                pattern2 = rf'({keyword_pattern})\s+(\d+)\s*(?:[\u0C00-\u0C7F\u0900-\u097Fa-z]+?\s+)?([\u0C00-\u0C7F\u0900-\u097Fa-z\s]+)'
-                
-                match = re.search(pattern1, text, re.IGNORECASE)
-                if not match:
-                    match = re.search(pattern2, text, re.IGNORECASE)
-                    if match:
-                        # Reorder groups for pattern2
-                        quantity = match.group(2)
-                        item = match.group(3)
-                    else:
-                        continue
-                else:
-                    quantity = match.group(1)
-                    item = match.group(2)
-                
-                if match:
-                    quantity = int(quantity)
-                    item = CommandParser._clean_item_name(item)
-                    if item:
-                        return ParsedCommand(
-                            action=action_type,
-                            item=item,
-                            quantity=quantity,
-                            raw_text=text,
-                            confidence=1.0
-                        )
+    # Skip a unit word directly after the quantity unless it is the whole item
+    end = len(tokens)
+    if start + 1 < end and tokens[start][0] == 'unit' and tokens[start + 1][0] in _ITEM_TOKENS:
+        start += 1
 
+    idx = start
+    while idx < end and tokens[idx][0] in _ITEM_TOKENS:
+        idx += 1
+    item_words = words[start:idx]
+    if not item_words or _contains_phrase_keyword(item_words):
         return None
 
-    @staticmethod
-    def _clean_item_name(raw_item: str) -> str:
-        """Clean and normalize item name by removing stop words and extra spaces"""
-        if not raw_item:
-            return ''
-        
-        # Combine all stop words from all languages
-        all_stop_words = set()
-        for lang_stops in STOP_WORDS.values():
-            all_stop_words.update(lang_stops)
-        
-        words = raw_item.strip().split()
-        # Remove stop words and clean
-        cleaned = [w for w in words if w.lower() not in all_stop_words and w.strip()]
-        return ' '.join(cleaned).strip() if cleaned else raw_item.strip()
-
-    @staticmethod
-    def _flexible_parse(text: str) -> Optional[ParsedCommand]:
-        """Fallback parser for less structured commands - multilingual"""
-        words = text.split()
-
-        # Find action using multilingual keywords
-        action = None
-        action_idx = -1
-        for i, word in enumerate(words):
-            for action_type, keywords in ACTION_KEYWORDS.items():
-                if word.lower() in [k.lower() for k in keywords]:
-                    action = action_type
-                    action_idx = i
-                    break
-            if action:
-                break
-
-        if not action:
+    if action is None:
+        # Postfix form: one or more trailing keywords of the same action
+        if idx == end or tokens[idx][0] != 'action' or tokens[idx][1] not in _STRUCTURED_ACTIONS:
             return None
+        action = tokens[idx][1]
+        if any(token != ('action', action) for token in tokens[idx:]):
+            return None
+    elif idx != end:
+        return None
+
+    item = _clean_item_name(' '.join(item_words))
+    if not item:
+        return None
+
+    return ParsedCommand(
+        action=action,
+        item=item,
+        quantity=quantity,
+        raw_text=text,
+        confidence=1.0
+    )
+
+
+def _edge_action(words, leading: bool) -> Optional[str]:
+    """Return the structured action whose keyword starts (or ends) the command"""
+    for count in range(1, _MAX_KEYWORD_WORDS + 1):
+        edge = words[:count] if leading else words[-count:]
+        action_type = _KEYWORD_TO_ACTION.get(' '.join(edge))
+        if action_type in _STRUCTURED_ACTIONS:
+            return action_type
+    return None
+
+
+def _try_structured_parse(text: str) -> Optional[ParsedCommand]:
+    """Try to parse using strict patterns for multilingual support"""
+    words = text.split()
+
+    # Keywords of different actions at the two ends are ambiguous; leave the
+    # command to the flexible parser rather than guessing an edge
+    edge_actions = (_edge_action(words, True), _edge_action(words, False))
+    if all(edge_actions) and edge_actions[0] != edge_actions[1]:
+        return None
+
+    # The keyword position picks the single pattern worth running:
+    # "add 10 rice" (pattern2) or "10 బిస్కెట్లు ఆడ్ చెయ్" / "10 पैकेट जोड़ो" (pattern1)
+    for leading, action_type in zip((True, False), edge_actions):
+        if not action_type:
+            continue
+        pattern1, pattern2 = _STRUCTURED_PATTERNS[action_type]
+        match = (pattern2 if leading else pattern1).match(text)
+        if not match:
+            continue
+
+        quantity = int(match.group('quantity'))
+        item = _clean_item_name(match.group('item'))
+        if item:
+            return ParsedCommand(
+                action=action_type,
+                item=item,
+                quantity=quantity,
+                raw_text=text,
+                confidence=1.0
+            )
+
+    return None
 
-        # Extract quantity
-        quantity = 0
-        quantity_idx = -1
-        for i, word in enumerate(words):
-            if word.isdigit():
+
+def _clean_item_name(raw_item: str) -> str:
+    """Clean and normalize item name by removing stop words and extra spaces"""
+    if not raw_item:
+        return ''
+
+    words = raw_item.strip().split()
+    # Remove stop words and clean
+    cleaned = [w for w in words if w.lower() not in ALL_STOP_WORDS and w.strip()]
+    return ' '.join(cleaned).strip() if cleaned else raw_item.strip()
+
+
+def _flexible_parse(text: str) -> Optional[ParsedCommand]:
+    """Fallback parser for less structured commands - multilingual"""
+    # Single pass: first action keyword, first number, everything else is the item.
+    # A unit word is only dropped right after a number ("2 kg gram flour"), so
+    # names like "gram flour" or "unit price" keep it everywhere else.
+    action = None
+    quantity = None
+    item_words = []
+    after_number = False
+    for word in text.split():
+        lowered = word.lower()
+        follows_number, after_number = after_number, False
+        keyword_action = _KEYWORD_TO_ACTION.get(lowered)
+        if keyword_action:
+            if action is None:
+                action = keyword_action
+            continue
+        if word.isdecimal():
+            if quantity is None:
                 quantity = int(word)
-                quantity_idx = i
-                break
-
-        # Extract item name (words that are not action, not quantity, not stop words)
-        all_stop_words = set()
-        for lang_stops in STOP_WORDS.values():
-            all_stop_words.update([s.lower() for s in lang_stops])
-        
-        # Collect all action keywords
-        all_action_keywords = set()
-        for keywords in ACTION_KEYWORDS.values():
-            all_action_keywords.update([k.lower() for k in keywords])
-        
-        item_words = []
-        for i, word in enumerate(words):
-            # Skip action words, quantity, and stop words
-            if (word.lower() in all_action_keywords or 
-                word.isdigit() or 
-                word.lower() in all_stop_words):
-                continue
-            item_words.append(word)
-
-        item = ' '.join(item_words).strip()
-        if not item:
-            return None
+            after_number = True
+            continue
+        if lowered in ALL_STOP_WORDS or (follows_number and lowered in _ALL_UNIT_WORDS):
+            continue
+        item_words.append(word)
 
-        return ParsedCommand(
-            action=action,
-            item=item,
-            quantity=quantity if quantity > 0 else 1,
-            raw_text=text,
-            confidence=0.7
-        )
+    if not action:
+        return None
+
+    item = ' '.join(item_words).strip()
+    if not item:
+        return None
+
+    return ParsedCommand(
+        action=action,
+        item=item,
+        quantity=quantity if quantity else 1,
+        raw_text=text,
+        confidence=0.7
+    )
+
+
+class CommandParser:
+    """Parse natural language commands in multiple languages into structured data.
+    Kept as a thin namespace over the module-level parser functions."""
+
+    parse = staticmethod(_parse)
+
+
+@lru_cache(maxsize=2048)
+def _parse_normalized(text: str) -> Optional[ParsedCommand]:
+    return _parse(text)
 
 
 def parse_command(text: str) -> Optional[ParsedCommand]:
-    """Main function to parse commands"""
-    return CommandParser.parse(text)
+    """
+    Main function to parse commands. Voice commands repeat a lot, so results
+    are memoized on the normalized text; parsing already ignores case and
+    surrounding whitespace, so "Add 5 Apples " and "add 5 apples" share an entry.
+    """
+    if not text:
+        return None
+    return _parse_normalized(text.strip().lower())
 
 
 if __name__ == "__main__":
@@ -168,6 +318,11 @@ if __name__ == "__main__":
         "update rice to 20",
         "check rice",
         "list all items",
+        "add 2 kg gram flour",
+        "update gram flour to 4",
+        "check gram flour",
+        "set unit price to 5",
+        "add 10 show pieces",
     ]
     for cmd in test_commands:
         result = parse_command(cmd)
@@ -6,20 +6,35 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # Database configuration - stored in database/ folder at project root
 DB_PATH = os.path.join(BASE_DIR, '..', 'database', 'inventory.db')
 
+# Frontend files served by Flask, resolved once at import
+FRONTEND_DIR = os.path.realpath(os.path.join(BASE_DIR, '..', 'frontend'))
+
 # App configuration
-DEBUG = True
+DEBUG = os.environ.get('FLASK_DEBUG', '1') == '1'
 HOST = '0.0.0.0'
 PORT = 5000
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 8))  # waitress worker threads when not debugging
+
+# Static file serving
+# X-Sendfile hands file bodies to a fronting nginx/apache; only enable behind one
+USE_X_SENDFILE = os.environ.get('USE_X_SENDFILE') == '1'
+STATIC_MAX_AGE = 300  # Seconds browsers may reuse frontend files before revalidating
+
+# Response cache for read-only API endpoints; cleared on every write request
+CACHE_TYPE = 'SimpleCache'
+CACHE_TIMEOUT = 5  # Seconds a cached GET response may be served
 
 # Audio settings
 ALLOWED_AUDIO_EXTENSIONS = {'wav', 'mp3', 'ogg'}
 MAX_AUDIO_SIZE = 10 * 1024 * 1024  # 10MB
+MOCK_LATENCY_MS = int(os.environ.get('MOCK_LATENCY_MS', 0))  # Simulated mock speech-to-text delay
 
 # Inventory settings
 LOW_STOCK_THRESHOLD = 5  # Items below this quantity are considered low stock
+WRITE_TIMEOUT = float(os.environ.get('WRITE_TIMEOUT', 30))  # Seconds an add waits for its batched commit
 
 # Logging configuration
-LOG_LEVEL = 'INFO'
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO' if DEBUG else 'WARNING').upper()
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
 # CORS settings - allow frontend dev servers and the Flask server itself
@@ -29,5 +44,5 @@ CORS_ORIGINS = [
     'http://localhost:5500',
     'http://127.0.0.1:5500',
     'http://localhost:3000',
-    '*'
 ]
+CORS_MAX_AGE = 86400  # Seconds browsers may cache a preflight response
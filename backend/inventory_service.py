@@ -1,15 +1,50 @@
+import itertools
 import logging
-from typing import List, Dict, Optional, Tuple
-from datetime import datetime
+import threading
+from typing import Iterator, List, Dict, Optional, Tuple
 
 from shared.models import InventoryItem, InventoryStats
-from shared.constants import MESSAGES
-from database.db_connection import execute_query, get_db_cursor
+from shared.constants import MESSAGES, CATEGORY_KEYWORDS
+from shared.categories import classify_item
+from database.db_connection import execute_query, get_db_transaction, iter_query
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows per IN (...) lookup, well under SQLite's default 999 host-parameter limit
+_BATCH_SIZE = 500
+
+# Columns returned for an item; callers never need created_at
+_COLS = "id, name, quantity, updated_at"
+# Stock status computed during the scan; bind LOW_STOCK_THRESHOLD to the placeholder
+_STATUS_SQL = "CASE WHEN quantity <= 0 THEN 'out-of-stock' WHEN quantity < ? THEN 'low-stock' ELSE 'in-stock' END AS status"
+_LOG_COLS = "id, action, item_id, item_name, quantity_change, previous_quantity, new_quantity, timestamp"
+
+# Read cache for the full item list. Every committed mutation bumps the
+# version and drops the cached value; a reader only stores its result if no
+# mutation landed while it was querying.
+_cache = {'version': 0, 'items': None, 'stats': None}
+_cache_lock = threading.Lock()
+_version = itertools.count(1)
+
+
+def _invalidate_cache() -> None:
+    with _cache_lock:
+        _cache['version'] = next(_version)
+        _cache['items'] = None
+        _cache['stats'] = None
+
+
+def _category_case_sql() -> str:
+    """Build a SQL CASE expression mapping an item name to its category"""
+    whens = []
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        condition = ' OR '.join(f"name LIKE '%{keyword}%'" for keyword in keywords)
+        whens.append(f"WHEN {condition} THEN '{category}'")
+    return f"CASE {' '.join(whens)} ELSE 'Other' END"
+
+
+_CATEGORY_SQL = _category_case_sql()
+
 
 class InventoryService:
     """Business logic layer for inventory management"""
@@ -18,49 +53,84 @@ class InventoryService:
 
     @staticmethod
     def get_all_items() -> List[Dict]:
+        with _cache_lock:
+            if _cache['items'] is not None:
+                return _cache['items']
+            version = _cache['version']
+
         try:
-            query = "SELECT * FROM inventory ORDER BY updated_at DESC, id DESC"
-            items = execute_query(query, fetch_all=True)
-            return items or []
+            query = f"SELECT {_COLS}, {_STATUS_SQL} FROM inventory ORDER BY updated_at DESC, id DESC"
+            items = execute_query(query, (InventoryService.LOW_STOCK_THRESHOLD,), fetch_all=True) or []
+            with _cache_lock:
+                if _cache['version'] == version:
+                    _cache['items'] = items
+            return items
         except Exception as e:
-            logger.error(f"Error getting all items: {e}")
+            logger.error("Error getting all items: %s", e)
             return []
 
     @staticmethod
     def get_item(item_name: str) -> Optional[Dict]:
         try:
-            query = "SELECT * FROM inventory WHERE LOWER(name) = LOWER(?)"
+            query = f"SELECT {_COLS} FROM inventory WHERE LOWER(name) = LOWER(?)"
             return execute_query(query, (item_name,), fetch_one=True)
         except Exception as e:
-            logger.error(f"Error getting item {item_name}: {e}")
+            logger.error("Error getting item %s: %s", item_name, e)
             return None
 
     @staticmethod
-    def add_item(item_name: str, quantity: int) -> Tuple[bool, str, Optional[Dict]]:
+    def search_items(search_term: str) -> List[Dict]:
         try:
-            existing = InventoryService.get_item(item_name)
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            # The trigram index needs at least three characters to match on
+            if len(search_term) >= 3:
+                return execute_query(f"""
+                    SELECT {', '.join(f'i.{col}' for col in _COLS.split(', '))}
+                    FROM inventory_fts f JOIN inventory i ON i.id = f.rowid
+                    WHERE inventory_fts MATCH ?
+                    ORDER BY i.name
+                """, ('"' + search_term.replace('"', '""') + '"',), fetch_all=True)
+            return execute_query(
+                f"SELECT {_COLS} FROM inventory WHERE LOWER(name) LIKE LOWER(?) ORDER BY name",
+                (f"%{search_term}%",), fetch_all=True
+            )
+        except Exception as e:
+            logger.error("Error searching items for %s: %s", search_term, e)
+            return []
+
+    @staticmethod
+    def _get_item_in_transaction(cursor, item_name: str) -> Optional[Dict]:
+        """Look up an item on the write transaction's cursor so the row cannot change before the write"""
+        cursor.execute(f"SELECT {_COLS} FROM inventory WHERE LOWER(name) = LOWER(?)", (item_name,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
 
-            with get_db_cursor() as cursor:
+    @staticmethod
+    def add_item(item_name: str, quantity: int) -> Tuple[bool, str, Optional[Dict]]:
+        try:
+            with get_db_transaction() as cursor:
+                existing = InventoryService._get_item_in_transaction(cursor, item_name)
                 if existing:
                     new_quantity = existing['quantity'] + quantity
                     cursor.execute(
-                        "UPDATE inventory SET quantity=?, updated_at=? WHERE id=?",
-                        (new_quantity, now, existing['id'])
+                        "UPDATE inventory SET quantity=?, updated_at=CURRENT_TIMESTAMP WHERE id=? RETURNING updated_at",
+                        (new_quantity, existing['id'])
                     )
+                    updated_at = cursor.fetchone()['updated_at']
 
                     cursor.execute("""
                         INSERT INTO transaction_log
                         (action, item_id, item_name, quantity_change, previous_quantity, new_quantity)
                         VALUES (?, ?, ?, ?, ?, ?)
                     """, ('add', existing['id'], item_name, quantity, existing['quantity'], new_quantity))
+                    item = {**existing, 'quantity': new_quantity, 'updated_at': updated_at}
 
                 else:
                     cursor.execute(
-                        "INSERT INTO inventory (name, quantity, updated_at) VALUES (?, ?, ?)",
-                        (item_name, quantity, now)
+                        f"INSERT INTO inventory (name, quantity, category) VALUES (?, ?, ?) RETURNING {_COLS}",
+                        (item_name, quantity, classify_item(item_name))
                     )
-                    item_id = cursor.lastrowid
+                    item = dict(cursor.fetchone())
+                    item_id = item['id']
 
                     cursor.execute("""
                         INSERT INTO transaction_log
@@ -68,59 +138,136 @@ class InventoryService:
                         VALUES (?, ?, ?, ?, ?)
                     """, ('add', item_id, item_name, quantity, quantity))
 
-            item = InventoryService.get_item(item_name)
+            _invalidate_cache()
             return True, MESSAGES['ITEM_ADDED'].format(quantity=quantity, item=item_name), item
 
         except Exception as e:
-            logger.error(f"Error adding item {item_name}: {e}")
+            logger.error("Error adding item %s: %s", item_name, e)
             return False, f"Error adding item: {str(e)}", None
 
     @staticmethod
-    def remove_item(item_name: str, quantity: int) -> Tuple[bool, str, Optional[Dict]]:
+    def add_items(rows: List[Tuple[str, int]]) -> Tuple[bool, str, List[Dict]]:
+        """
+        Add many (item_name, quantity) rows in a single transaction.
+        Existing items are resolved with batched IN lookups and all writes go
+        through executemany, instead of one add_item call per row.
+        """
         try:
-            existing = InventoryService.get_item(item_name)
-            if not existing:
-                return False, MESSAGES['ITEM_NOT_FOUND'].format(item=item_name), None
+            # Merge repeated names (case-insensitive) so each item is written once
+            totals = {}
+            for item_name, quantity in rows:
+                key = item_name.lower()
+                if key in totals:
+                    totals[key][1] += quantity
+                else:
+                    totals[key] = [item_name, quantity]
 
-            if existing['quantity'] < quantity:
-                return False, MESSAGES['INSUFFICIENT_STOCK'].format(item=item_name, available=existing['quantity']), None
+            with get_db_transaction() as cursor:
+                existing = InventoryService._get_items_in_transaction(
+                    cursor, [item_name for item_name, _ in totals.values()]
+                )
 
-            new_quantity = existing['quantity'] - quantity
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                updates, inserts, log_rows = [], [], []
+                for key, (item_name, quantity) in totals.items():
+                    row = existing.get(key)
+                    if row:
+                        new_quantity = row['quantity'] + quantity
+                        updates.append((new_quantity, row['id']))
+                        log_rows.append(('add', row['id'], item_name, quantity, row['quantity'], new_quantity))
+                    else:
+                        inserts.append((item_name, quantity))
+
+                cursor.executemany("UPDATE inventory SET quantity=?, updated_at=CURRENT_TIMESTAMP WHERE id=?", updates)
+                cursor.executemany(
+                    "INSERT INTO inventory (name, quantity, category) VALUES (?, ?, ?)",
+                    [(item_name, quantity, classify_item(item_name)) for item_name, quantity in inserts]
+                )
 
-            with get_db_cursor() as cursor:
-                cursor.execute(
-                    "UPDATE inventory SET quantity=?, updated_at=? WHERE id=?",
-                    (new_quantity, now, existing['id'])
+                # executemany reports neither new row ids nor the timestamps
+                # SQLite assigned, so read every touched row back in one pass
+                written = InventoryService._get_items_in_transaction(
+                    cursor, [item_name for item_name, _ in totals.values()]
                 )
+                items = [written[key] for key in totals]
+                for item_name, quantity in inserts:
+                    row = written[item_name.lower()]
+                    log_rows.append(('add', row['id'], item_name, quantity, None, quantity))
+
+                cursor.executemany("""
+                    INSERT INTO transaction_log
+                    (action, item_id, item_name, quantity_change, previous_quantity, new_quantity)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, log_rows)
+
+            _invalidate_cache()
+            return True, MESSAGES['ITEMS_ADDED'].format(count=len(items)), items
 
+        except Exception as e:
+            logger.error("Error adding items: %s", e)
+            return False, f"Error adding items: {str(e)}", []
+
+    @staticmethod
+    def _get_items_in_transaction(cursor, item_names: List[str]) -> Dict[str, Dict]:
+        """Look up many items on a transaction's cursor, keyed by lowercased name"""
+        found = {}
+        for start in range(0, len(item_names), _BATCH_SIZE):
+            chunk = item_names[start:start + _BATCH_SIZE]
+            placeholders = ', '.join(['LOWER(?)'] * len(chunk))
+            cursor.execute(f"SELECT {_COLS} FROM inventory WHERE LOWER(name) IN ({placeholders})", chunk)
+            for row in cursor.fetchall():
+                found[row['name'].lower()] = dict(row)
+        return found
+
+    @staticmethod
+    def remove_item(item_name: str, quantity: int) -> Tuple[bool, str, Optional[Dict]]:
+        try:
+            with get_db_transaction() as cursor:
+                # The stock check lives in the WHERE clause, so one statement
+                # both validates and applies the removal
+                cursor.execute(f"""
+                    UPDATE inventory SET quantity = quantity - ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE LOWER(name) = LOWER(?) AND quantity >= ?
+                    RETURNING {_COLS}
+                """, (quantity, item_name, quantity))
+                rows = cursor.fetchall()
+
+                if not rows:
+                    cursor.execute("SELECT quantity FROM inventory WHERE LOWER(name) = LOWER(?)", (item_name,))
+                    existing = cursor.fetchone()
+                    if not existing:
+                        return False, MESSAGES['ITEM_NOT_FOUND'].format(item=item_name), None
+                    return False, MESSAGES['INSUFFICIENT_STOCK'].format(item=item_name, available=existing['quantity']), None
+
+                item = dict(rows[0])
                 cursor.execute("""
                     INSERT INTO transaction_log
                     (action, item_id, item_name, quantity_change, previous_quantity, new_quantity)
                     VALUES (?, ?, ?, ?, ?, ?)
-                """, ('remove', existing['id'], item_name, -quantity, existing['quantity'], new_quantity))
+                """, ('remove', item['id'], item_name, -quantity, item['quantity'] + quantity, item['quantity']))
 
-            item = InventoryService.get_item(item_name)
+            _invalidate_cache()
             return True, MESSAGES['ITEM_REMOVED'].format(quantity=quantity, item=item_name), item
 
         except Exception as e:
-            logger.error(f"Error removing item {item_name}: {e}")
+            logger.error("Error removing item %s: %s", item_name, e)
             return False, f"Error removing item: {str(e)}", None
 
     @staticmethod
     def update_item(item_name: str, new_quantity: int) -> Tuple[bool, str, Optional[Dict]]:
         try:
-            existing = InventoryService.get_item(item_name)
-            if not existing:
-                return False, MESSAGES['ITEM_NOT_FOUND'].format(item=item_name), None
-
-            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            with get_db_transaction() as cursor:
+                existing = InventoryService._get_item_in_transaction(cursor, item_name)
+                if not existing:
+                    return False, MESSAGES['ITEM_NOT_FOUND'].format(item=item_name), None
+                if existing['quantity'] == new_quantity:
+                    # Nothing changes, so skip the write and the log row
+                    return True, MESSAGES['ITEM_UPDATED'].format(item=item_name, quantity=new_quantity), existing
 
-            with get_db_cursor() as cursor:
                 cursor.execute(
-                    "UPDATE inventory SET quantity=?, updated_at=? WHERE id=?",
-                    (new_quantity, now, existing['id'])
+                    "UPDATE inventory SET quantity=?, updated_at=CURRENT_TIMESTAMP WHERE id=? RETURNING updated_at",
+                    (new_quantity, existing['id'])
                 )
+                updated_at = cursor.fetchone()['updated_at']
 
                 cursor.execute("""
                     INSERT INTO transaction_log
@@ -128,11 +275,12 @@ class InventoryService:
                     VALUES (?, ?, ?, ?, ?, ?)
                 """, ('update', existing['id'], item_name, new_quantity - existing['quantity'], existing['quantity'], new_quantity))
 
-            item = InventoryService.get_item(item_name)
+            _invalidate_cache()
+            item = {**existing, 'quantity': new_quantity, 'updated_at': updated_at}
             return True, MESSAGES['ITEM_UPDATED'].format(item=item_name, quantity=new_quantity), item
 
         except Exception as e:
-            logger.error(f"Error updating item {item_name}: {e}")
+            logger.error("Error updating item %s: %s", item_name, e)
             return False, f"Error updating item: {str(e)}", None
 
     @staticmethod
@@ -140,59 +288,129 @@ class InventoryService:
         threshold = threshold or InventoryService.LOW_STOCK_THRESHOLD
         try:
             return execute_query(
-                "SELECT * FROM inventory WHERE quantity > 0 AND quantity < ? ORDER BY quantity ASC",
+                f"SELECT {_COLS} FROM inventory WHERE quantity > 0 AND quantity < ? ORDER BY quantity ASC",
                 (threshold,), fetch_all=True
             )
         except Exception as e:
-            logger.error(f"Error getting low stock items: {e}")
+            logger.error("Error getting low stock items: %s", e)
             return []
 
     @staticmethod
     def get_out_of_stock_items() -> List[Dict]:
         try:
-            return execute_query("SELECT * FROM inventory WHERE quantity = 0 ORDER BY name", fetch_all=True)
+            return execute_query(f"SELECT {_COLS} FROM inventory WHERE quantity = 0 ORDER BY name", fetch_all=True)
         except Exception as e:
-            logger.error(f"Error getting out of stock items: {e}")
+            logger.error("Error getting out of stock items: %s", e)
             return []
 
+    @staticmethod
+    def get_inventory_stats() -> InventoryStats:
+        """Aggregate counts and per-category totals in SQL rather than over a Python item list"""
+        with _cache_lock:
+            if _cache['stats'] is not None:
+                return _cache['stats']
+            version = _cache['version']
+
+        # One grouped pass; the few per-category rows are summed into the totals
+        rows = execute_query("""
+            SELECT category,
+                   COUNT(*) AS total_items,
+                   COALESCE(SUM(quantity), 0) AS total_quantity,
+                   SUM(CASE WHEN quantity > 0 AND quantity < ? THEN 1 ELSE 0 END) AS low_stock_count,
+                   SUM(CASE WHEN quantity = 0 THEN 1 ELSE 0 END) AS out_of_stock_count
+            FROM inventory
+            GROUP BY category
+        """, (InventoryService.LOW_STOCK_THRESHOLD,), fetch_all=True)
+
+        stats = InventoryStats(
+            total_items=sum(row['total_items'] for row in rows),
+            total_quantity=sum(row['total_quantity'] for row in rows),
+            low_stock_count=sum(row['low_stock_count'] for row in rows),
+            out_of_stock_count=sum(row['out_of_stock_count'] for row in rows),
+            categories={row['category']: row['total_items'] for row in rows}
+        )
+        with _cache_lock:
+            if _cache['version'] == version:
+                _cache['stats'] = stats
+        return stats
+
+    @staticmethod
+    def iter_transaction_log(limit: int = 50) -> Iterator[Dict]:
+        """Yield recent log entries one row at a time, for streamed responses"""
+        # Served newest-first by a backwards scan of idx_transaction_timestamp
+        return iter_query(
+            f"SELECT {_LOG_COLS} FROM transaction_log ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (limit,)
+        )
+
+    @staticmethod
+    def backfill_categories() -> int:
+        """Classify rows left without a category by databases created before the category column"""
+        with get_db_transaction() as cursor:
+            cursor.execute(f"UPDATE inventory SET category = {_CATEGORY_SQL} WHERE category IS NULL")
+            updated = cursor.rowcount
+        if updated:
+            _invalidate_cache()
+            logger.info("Backfilled category for %s items", updated)
+        return updated
+
     @staticmethod
     def clear_all_inventory() -> Tuple[bool, str]:
         try:
-            with get_db_cursor() as cursor:
+            with get_db_transaction() as cursor:
+                # transaction_log has no triggers, so this WHERE-less DELETE takes
+                # SQLite's truncate path; inventory still deletes row by row to
+                # keep the FTS index in step through its delete trigger
                 cursor.execute("DELETE FROM transaction_log")
                 cursor.execute("DELETE FROM inventory")
+                # Restart AUTOINCREMENT ids for the emptied tables
+                cursor.execute("DELETE FROM sqlite_sequence WHERE name IN ('inventory', 'transaction_log')")
 
+            _invalidate_cache()
             logger.warning("All inventory items cleared")
             return True, "All inventory items have been cleared"
 
         except Exception as e:
-            logger.error(f"Error clearing inventory: {e}")
+            logger.error("Error clearing inventory: %s", e)
             return False, f"Error clearing inventory: {str(e)}"
 
     @staticmethod
     def delete_item_by_id(item_id: int) -> None:
+        InventoryService.delete_items_by_ids([item_id])
+
+    @staticmethod
+    def delete_items_by_ids(item_ids: List[int]) -> int:
+        """Delete many items in one transaction; returns how many were deleted"""
         try:
-            with get_db_cursor() as cursor:
-                cursor.execute("SELECT name, quantity FROM inventory WHERE id=?", (item_id,))
-                item = cursor.fetchone()
+            deleted = []
+            with get_db_transaction() as cursor:
+                for start in range(0, len(item_ids), _BATCH_SIZE):
+                    chunk = item_ids[start:start + _BATCH_SIZE]
+                    placeholders = ', '.join(['?'] * len(chunk))
+                    cursor.execute(f"SELECT name, quantity FROM inventory WHERE id IN ({placeholders})", chunk)
+                    rows = cursor.fetchall()
+                    if not rows:
+                        continue
+
+                    # Keep the audit history but detach it, or the foreign key blocks the delete
+                    cursor.execute(f"UPDATE transaction_log SET item_id = NULL WHERE item_id IN ({placeholders})", chunk)
+                    cursor.execute(f"DELETE FROM inventory WHERE id IN ({placeholders})", chunk)
+                    cursor.executemany("""
+                        INSERT INTO transaction_log
+                        (action, item_name, quantity_change, new_quantity)
+                        VALUES ('delete', ?, ?, 0)
+                    """, [(row['name'], -row['quantity']) for row in rows])
+                    deleted.extend(row['name'] for row in rows)
 
-                if not item:
+                if not deleted:
                     raise Exception("Item not found")
 
-                item_name, quantity = item['name'], item['quantity']
-
-                cursor.execute("DELETE FROM inventory WHERE id=?", (item_id,))
-
-                cursor.execute("""
-                    INSERT INTO transaction_log
-                    (action, item_name, quantity_change, new_quantity)
-                    VALUES (?, ?, ?, ?)
-                """, ('delete', item_name, -quantity, 0))
-
-                logger.info(f"Deleted item {item_name}")
+            _invalidate_cache()
+            logger.info("Deleted items %s", ', '.join(deleted))
+            return len(deleted)
 
         except Exception as e:
-            logger.error(f"Error deleting item: {e}")
+            logger.error("Error deleting items: %s", e)
             raise Exception(str(e))
 
 
@@ -0,0 +1,82 @@
+import orjson
+from flask import Response, stream_with_context
+from flask.json.provider import JSONProvider
+
+from shared.constants import STATUS
+
+# Match the stdlib encoder's handling of non-string dict keys (e.g. a NULL category)
+_DUMPS_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """Fallback for types orjson does not serialize natively"""
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ORJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+    Installed as app.json, so every jsonify() call serializes through orjson
+    and response bodies go out as the bytes it produces, without a str round-trip.
+    """
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_default, option=_DUMPS_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_DUMPS_OPTIONS)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+# Pre-encoded head of every success envelope: {"status":"success","message":
+_OK_PREFIX = b'{"status":' + orjson.dumps(STATUS['SUCCESS']) + b',"message":'
+
+
+def ok(message: str, data=None) -> Response:
+    """
+    Success response with the same body as jsonify(ApiResponse(...).to_dict()),
+    spliced from pre-encoded bytes so only message and data are serialized.
+    """
+    body = b''.join((
+        _OK_PREFIX,
+        orjson.dumps(message),
+        b',"data":',
+        orjson.dumps(data, default=_default, option=_DUMPS_OPTIONS),
+        b'}'
+    ))
+    return Response(body, mimetype='application/json')
+
+
+# Head of a streamed success envelope; message follows data because it needs the row count
+_STREAM_PREFIX = b'{"status":' + orjson.dumps(STATUS['SUCCESS']) + b',"data":['
+
+
+def stream_ok(rows, message: str) -> Response:
+    """
+    Success response whose data array is encoded and sent one row at a time.
+    message may use {count}. The first row is fetched before returning so a
+    failing query still raises in the view instead of mid-stream.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+
+    def generate():
+        yield _STREAM_PREFIX
+        count = 0
+        if first is not None:
+            yield orjson.dumps(first, default=_default, option=_DUMPS_OPTIONS)
+            count = 1
+            for row in rows:
+                yield b',' + orjson.dumps(row, default=_default, option=_DUMPS_OPTIONS)
+                count += 1
+        yield b'],"message":' + orjson.dumps(message.format(count=count)) + b'}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
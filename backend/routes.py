@@ -1,26 +1,69 @@
-import os
-import sys
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 from flask import Blueprint, request, jsonify
-
-# Ensure project root is in path
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flask_caching import Cache
 
 from shared.constants import STATUS, MESSAGES
 from shared.models import ApiResponse, ParsedCommand
 from backend.speech_to_text import speech_to_text, process_text_command
 from backend.command_parser import parse_command
 from backend.inventory_service import InventoryService
+from backend.write_coalescer import write_coalescer
+from backend.json_provider import ok, stream_ok
+from backend.config import CACHE_TYPE, CACHE_TIMEOUT
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Bound once so responses skip the per-call dict lookups
+_OK, _ERR = STATUS['SUCCESS'], STATUS['ERROR']
+_DB_ERR = MESSAGES['DB_ERROR']
+_INVALID_CMD = MESSAGES['INVALID_COMMAND']
+
 # Create blueprint
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
+# Response cache for the read-only endpoints; bound to the app in create_app
+cache = Cache(config={'CACHE_TYPE': CACHE_TYPE, 'CACHE_DEFAULT_TIMEOUT': CACHE_TIMEOUT})
+
+
+def _is_success(rv) -> bool:
+    """Only cache successful responses, never errors"""
+    status_code = rv[1] if isinstance(rv, tuple) else rv.status_code
+    return status_code == 200
+
+
+def _item_and_quantity(data, allow_zero: bool = False) -> Tuple[str, int]:
+    """
+    Validate an {"item", "quantity"} payload shared by the mutating endpoints.
+    Returns (item_name, quantity) or raises ValueError with a client-facing message.
+    """
+    if not isinstance(data, dict) or 'item' not in data or 'quantity' not in data:
+        raise ValueError("Missing item or quantity")
+
+    item_name = str(data['item']).strip()
+    if not item_name:
+        raise ValueError("Missing item or quantity")
+
+    try:
+        quantity = int(data['quantity'])
+    except (TypeError, ValueError):
+        raise ValueError("Invalid quantity format") from None
+
+    if allow_zero and quantity < 0:
+        raise ValueError("Quantity cannot be negative")
+    if not allow_zero and quantity <= 0:
+        raise ValueError("Quantity must be positive")
+    return item_name, quantity
+
+
+@api_bp.after_request
+def invalidate_cached_reads(response):
+    """Any write request may change what the cached GET endpoints return"""
+    if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+        cache.clear()
+    return response
+
 
 @api_bp.route('/voice-command', methods=['POST'])
 def handle_voice_command():
@@ -31,29 +74,29 @@ def handle_voice_command():
     """
     try:
         data = request.get_json(force=True, silent=True)
-        if not data:
+        if not data or not isinstance(data, dict):
             return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
+                status=_ERR,
                 message="No data provided"
             ).to_dict()), 400
 
         # Process input (text or audio)
-        command_text = None
-        if 'text' in data and data['text']:
-            command_text = process_text_command(data['text'])
-            logger.info(f"Processing text command: {command_text}")
+        text = data.get('text')
+        if text:
+            command_text = process_text_command(text)
+            logger.info("Processing text command: %s", command_text)
         elif 'audio' in data:
             command_text = speech_to_text()
-            logger.info(f"Processed audio to text: {command_text}")
+            logger.info("Processed audio to text: %s", command_text)
         else:
             return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
+                status=_ERR,
                 message="No text or audio provided"
             ).to_dict()), 400
 
         if not command_text:
             return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
+                status=_ERR,
                 message="Empty command received"
             ).to_dict()), 400
 
@@ -61,8 +104,8 @@ def handle_voice_command():
         parsed = parse_command(command_text)
         if not parsed:
             return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
-                message=MESSAGES['INVALID_COMMAND'].format(command=command_text)
+                status=_ERR,
+                message=_INVALID_CMD.format(command=command_text)
             ).to_dict()), 400
 
         # Execute based on action
@@ -78,44 +121,33 @@ def handle_voice_command():
         }
 
         return jsonify(ApiResponse(
-            status=STATUS['SUCCESS'] if result.get('success') else STATUS['ERROR'],
+            status=_OK if result.get('success') else _ERR,
             message=result.get('message', 'Command processed successfully'),
             data=response_data
         ).to_dict()), 200
 
     except Exception as e:
-        logger.error(f"Error processing voice command: {e}")
+        logger.error("Error processing voice command: %s", e)
         return jsonify(ApiResponse(
-            status=STATUS['ERROR'],
+            status=_ERR,
             message=f"Server error: {str(e)}"
         ).to_dict()), 500
 
 
 @api_bp.route('/inventory', methods=['GET'])
+@cache.cached(query_string=True, response_filter=_is_success)
 def get_inventory():
     """Get all inventory items"""
     try:
+        # Rows arrive with their stock status already computed by the query
         items = InventoryService.get_all_items()
-        for item in items:
-            qty = item['quantity']
-            if qty <= 0:
-                item['status'] = 'out-of-stock'
-            elif qty < InventoryService.LOW_STOCK_THRESHOLD:
-                item['status'] = 'low-stock'
-            else:
-                item['status'] = 'in-stock'
-
-        return jsonify(ApiResponse(
-            status=STATUS['SUCCESS'],
-            message=f"Retrieved {len(items)} items",
-            data=items
-        ).to_dict()), 200
+        return ok(f"Retrieved {len(items)} items", items), 200
 
     except Exception as e:
-        logger.error(f"Error getting inventory: {e}")
+        logger.error("Error getting inventory: %s", e)
         return jsonify(ApiResponse(
-            status=STATUS['ERROR'],
-            message=MESSAGES['DB_ERROR']
+            status=_ERR,
+            message=_DB_ERR
         ).to_dict()), 500
 
 
@@ -124,30 +156,45 @@ def add_inventory():
     """Add item to inventory"""
     try:
         data = request.get_json(force=True, silent=True)
-        if not data or 'item' not in data or 'quantity' not in data:
-            return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
-                message="Missing item or quantity"
-            ).to_dict()), 400
+        try:
+            item_name, quantity = _item_and_quantity(data)
+        except ValueError as e:
+            return jsonify(ApiResponse(status=_ERR, message=str(e)).to_dict()), 400
+
+        # Concurrent adds are committed together in one transaction
+        success, message, item = write_coalescer.add(item_name, quantity)
+        status_code = _OK if success else _ERR
+        return jsonify(ApiResponse(status=status_code, message=message, data=item).to_dict()), 200
 
-        item_name = str(data['item']).strip()
-        quantity = int(data['quantity'])
+    except Exception as e:
+        logger.error("Error adding inventory: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
-        if quantity <= 0:
+
+@api_bp.route('/inventory/bulk-add', methods=['POST'])
+def bulk_add_inventory():
+    """Add multiple items to inventory in one transaction"""
+    try:
+        data = request.get_json(force=True, silent=True)
+        entries = data.get('items') if isinstance(data, dict) else None
+        if not entries or not isinstance(entries, list):
             return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
-                message="Quantity must be positive"
+                status=_ERR,
+                message="No items provided"
             ).to_dict()), 400
 
-        success, message, item = InventoryService.add_item(item_name, quantity)
-        status_code = STATUS['SUCCESS'] if success else STATUS['ERROR']
-        return jsonify(ApiResponse(status=status_code, message=message, data=item).to_dict()), 200
+        try:
+            rows = [_item_and_quantity(entry) for entry in entries]
+        except ValueError as e:
+            return jsonify(ApiResponse(status=_ERR, message=str(e)).to_dict()), 400
+
+        success, message, items = InventoryService.add_items(rows)
+        status_code = _OK if success else _ERR
+        return jsonify(ApiResponse(status=status_code, message=message, data=items).to_dict()), 200
 
-    except ValueError:
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message="Invalid quantity format").to_dict()), 400
     except Exception as e:
-        logger.error(f"Error adding inventory: {e}")
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message=MESSAGES['DB_ERROR']).to_dict()), 500
+        logger.error("Error bulk adding inventory: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
 
 @api_bp.route('/inventory/remove', methods=['POST'])
@@ -155,30 +202,18 @@ def remove_inventory():
     """Remove item from inventory"""
     try:
         data = request.get_json(force=True, silent=True)
-        if not data or 'item' not in data or 'quantity' not in data:
-            return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
-                message="Missing item or quantity"
-            ).to_dict()), 400
-
-        item_name = str(data['item']).strip()
-        quantity = int(data['quantity'])
-
-        if quantity <= 0:
-            return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
-                message="Quantity must be positive"
-            ).to_dict()), 400
+        try:
+            item_name, quantity = _item_and_quantity(data)
+        except ValueError as e:
+            return jsonify(ApiResponse(status=_ERR, message=str(e)).to_dict()), 400
 
         success, message, item = InventoryService.remove_item(item_name, quantity)
-        status_code = STATUS['SUCCESS'] if success else STATUS['ERROR']
+        status_code = _OK if success else _ERR
         return jsonify(ApiResponse(status=status_code, message=message, data=item).to_dict()), 200
 
-    except ValueError:
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message="Invalid quantity format").to_dict()), 400
     except Exception as e:
-        logger.error(f"Error removing inventory: {e}")
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message=MESSAGES['DB_ERROR']).to_dict()), 500
+        logger.error("Error removing inventory: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
 
 @api_bp.route('/inventory/update', methods=['PUT', 'POST'])
@@ -186,30 +221,18 @@ def update_inventory():
     """Update inventory item"""
     try:
         data = request.get_json(force=True, silent=True)
-        if not data or 'item' not in data or 'quantity' not in data:
-            return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
-                message="Missing item or quantity"
-            ).to_dict()), 400
-
-        item_name = str(data['item']).strip()
-        quantity = int(data['quantity'])
-
-        if quantity < 0:
-            return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
-                message="Quantity cannot be negative"
-            ).to_dict()), 400
+        try:
+            item_name, quantity = _item_and_quantity(data, allow_zero=True)
+        except ValueError as e:
+            return jsonify(ApiResponse(status=_ERR, message=str(e)).to_dict()), 400
 
         success, message, item = InventoryService.update_item(item_name, quantity)
-        status_code = STATUS['SUCCESS'] if success else STATUS['ERROR']
+        status_code = _OK if success else _ERR
         return jsonify(ApiResponse(status=status_code, message=message, data=item).to_dict()), 200
 
-    except ValueError:
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message="Invalid quantity format").to_dict()), 400
     except Exception as e:
-        logger.error(f"Error updating inventory: {e}")
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message=MESSAGES['DB_ERROR']).to_dict()), 500
+        logger.error("Error updating inventory: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
 
 @api_bp.route('/inventory/search', methods=['GET'])
@@ -219,70 +242,57 @@ def search_inventory():
         search_term = request.args.get('q', '').strip()
         if not search_term:
             return jsonify(ApiResponse(
-                status=STATUS['ERROR'],
+                status=_ERR,
                 message="Search term required"
             ).to_dict()), 400
 
         items = InventoryService.search_items(search_term)
-        return jsonify(ApiResponse(
-            status=STATUS['SUCCESS'],
-            message=f"Found {len(items)} items",
-            data=items
-        ).to_dict()), 200
+        return ok(f"Found {len(items)} items", items), 200
 
     except Exception as e:
-        logger.error(f"Error searching inventory: {e}")
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message=MESSAGES['DB_ERROR']).to_dict()), 500
+        logger.error("Error searching inventory: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
 
 @api_bp.route('/inventory/low-stock', methods=['GET'])
+@cache.cached(query_string=True, response_filter=_is_success)
 def get_low_stock():
     """Get low stock items"""
     try:
         threshold = request.args.get('threshold', default=5, type=int)
         items = InventoryService.get_low_stock_items(threshold)
-        return jsonify(ApiResponse(
-            status=STATUS['SUCCESS'],
-            message=f"Found {len(items)} low stock items",
-            data=items
-        ).to_dict()), 200
+        return ok(f"Found {len(items)} low stock items", items), 200
 
     except Exception as e:
-        logger.error(f"Error getting low stock: {e}")
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message=MESSAGES['DB_ERROR']).to_dict()), 500
+        logger.error("Error getting low stock: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
 
 @api_bp.route('/inventory/stats', methods=['GET'])
+@cache.cached(query_string=True, response_filter=_is_success)
 def get_stats():
     """Get inventory statistics"""
     try:
         stats = InventoryService.get_inventory_stats()
-        return jsonify(ApiResponse(
-            status=STATUS['SUCCESS'],
-            message="Statistics retrieved",
-            data=stats.to_dict()
-        ).to_dict()), 200
+        # orjson encodes the InventoryStats dataclass directly
+        return ok("Statistics retrieved", stats), 200
 
     except Exception as e:
-        logger.error(f"Error getting stats: {e}")
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message=MESSAGES['DB_ERROR']).to_dict()), 500
+        logger.error("Error getting stats: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
 
 @api_bp.route('/inventory/transactions', methods=['GET'])
 def get_transactions():
-    """Get recent transactions"""
+    """Stream recent transactions (not response-cached: a streamed body cannot be stored)"""
     try:
         limit = request.args.get('limit', default=50, type=int)
-        logs = InventoryService.get_transaction_log(limit)
-        return jsonify(ApiResponse(
-            status=STATUS['SUCCESS'],
-            message=f"Retrieved {len(logs)} transactions",
-            data=logs
-        ).to_dict()), 200
+        logs = InventoryService.iter_transaction_log(limit)
+        return stream_ok(logs, "Retrieved {count} transactions"), 200
 
     except Exception as e:
-        logger.error(f"Error getting transactions: {e}")
-        return jsonify(ApiResponse(status=STATUS['ERROR'], message=MESSAGES['DB_ERROR']).to_dict()), 500
+        logger.error("Error getting transactions: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
 
 
 @api_bp.route('/health', methods=['GET'])
@@ -292,16 +302,28 @@ def health_check():
 
 
 @api_bp.route('/clear', methods=['POST'])
-def clear_inventory():
-    """Clear all inventory items"""
+def clear_inventory_legacy():
+    """Clear all inventory items (original endpoint, keeps its {success, message} body)"""
     try:
         success, message = InventoryService.clear_all_inventory()
         return jsonify({'success': success, 'message': message})
     except Exception as e:
-        logging.error(f"Error clearing inventory: {str(e)}")
+        logger.error("Error clearing inventory: %s", e)
         return jsonify({'success': False, 'message': f'Error: {str(e)}'})
 
 
+@api_bp.route('/inventory/clear', methods=['POST'])
+def clear_inventory():
+    """Clear all inventory items"""
+    try:
+        success, message = InventoryService.clear_all_inventory()
+        status_code = _OK if success else _ERR
+        return jsonify(ApiResponse(status=status_code, message=message).to_dict()), 200 if success else 500
+    except Exception as e:
+        logger.error("Error clearing inventory: %s", e)
+        return jsonify(ApiResponse(status=_ERR, message=_DB_ERR).to_dict()), 500
+
+
 @api_bp.route('/inventory/<int:item_id>', methods=['DELETE'])
 def delete_inventory_item(item_id):
     """Delete a specific inventory item by ID"""
@@ -309,7 +331,7 @@ def delete_inventory_item(item_id):
         InventoryService.delete_item_by_id(item_id)
         return jsonify({'success': True, 'message': 'Item deleted successfully'})
     except Exception as e:
-        logging.error(f"Error deleting item: {str(e)}")
+        logger.error("Error deleting item: %s", e)
         return jsonify({'success': False, 'message': f'Error: {str(e)}'})
 
 
@@ -321,22 +343,26 @@ def batch_delete_items():
         item_ids = data.get('item_ids', [])
         if not item_ids:
             return jsonify({'success': False, 'message': 'No items selected'})
-        for item_id in item_ids:
-            InventoryService.delete_item_by_id(item_id)
-        return jsonify({'success': True, 'message': f'{len(item_ids)} item(s) deleted successfully'})
+        deleted = InventoryService.delete_items_by_ids(item_ids)
+        return jsonify({'success': True, 'message': f'{deleted} item(s) deleted successfully'})
     except Exception as e:
-        logging.error(f"Error in batch delete: {str(e)}")
+        logger.error("Error in batch delete: %s", e)
         return jsonify({'success': False, 'message': f'Error: {str(e)}'})
 
 
+# Parsed actions that map straight onto an (item, quantity) service call
+_QUANTITY_ACTIONS = {
+    'add': write_coalescer.add,
+    'remove': InventoryService.remove_item,
+    'update': InventoryService.update_item
+}
+
+
 def execute_inventory_action(parsed: ParsedCommand) -> Dict[str, Any]:
     """Execute inventory action based on parsed command"""
-    if parsed.action == 'add':
-        success, message, data = InventoryService.add_item(parsed.item, parsed.quantity)
-    elif parsed.action == 'remove':
-        success, message, data = InventoryService.remove_item(parsed.item, parsed.quantity)
-    elif parsed.action == 'update':
-        success, message, data = InventoryService.update_item(parsed.item, parsed.quantity)
+    handler = _QUANTITY_ACTIONS.get(parsed.action)
+    if handler:
+        success, message, data = handler(parsed.item, parsed.quantity)
     elif parsed.action == 'check':
         data = InventoryService.get_item(parsed.item)
         if data:
@@ -1,10 +1,12 @@
+import itertools
 import logging
 import os
 import random
+import time
 from typing import Optional
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from backend.config import MOCK_LATENCY_MS
+
 logger = logging.getLogger(__name__)
 
 class SpeechToText:
@@ -34,6 +36,20 @@ class SpeechToText:
             "quantity of monitors"
         ]
     }
+
+    # Returned when no audio file (or no recognizable filename) is given
+    DEFAULT_RESPONSES = (
+        "add 5 apples",
+        "check inventory",
+        "update orange quantity to 10"
+    )
+
+    # Shuffled once at import and cycled, so picking a response needs no RNG call
+    _RESPONSE_CYCLES = {
+        key: itertools.cycle(random.sample(responses, len(responses)))
+        for key, responses in MOCK_RESPONSES.items()
+    }
+    _DEFAULT_CYCLE = itertools.cycle(random.sample(DEFAULT_RESPONSES, len(DEFAULT_RESPONSES)))
     
     @staticmethod
     def convert_audio_to_text(audio_file_path: Optional[str] = None) -> str:
@@ -42,41 +58,33 @@ class SpeechToText:
         In production, this would use a real speech recognition service
         """
         try:
-            # Simulate processing delay
-            import time
-            time.sleep(1)
+            # Optional simulated recognition delay (MOCK_LATENCY_MS), off by default
+            if MOCK_LATENCY_MS:
+                time.sleep(MOCK_LATENCY_MS / 1000)
             
             # If audio file is provided, mock processing based on filename
             if audio_file_path and os.path.exists(audio_file_path):
-                logger.info(f"Processing audio file: {audio_file_path}")
+                logger.info("Processing audio file: %s", audio_file_path)
                 
                 # Mock: Extract intent from filename or generate random response
                 filename = os.path.basename(audio_file_path).lower()
                 
-                if 'add' in filename:
-                    return random.choice(SpeechToText.MOCK_RESPONSES['add'])
-                elif 'remove' in filename:
-                    return random.choice(SpeechToText.MOCK_RESPONSES['remove'])
-                elif 'update' in filename:
-                    return random.choice(SpeechToText.MOCK_RESPONSES['update'])
-                elif 'check' in filename:
-                    return random.choice(SpeechToText.MOCK_RESPONSES['check'])
+                # First matching intent wins (add, remove, update, check)
+                for intent, responses in SpeechToText._RESPONSE_CYCLES.items():
+                    if intent in filename:
+                        return next(responses)
             
             # Default mock response
-            return random.choice([
-                "add 5 apples",
-                "check inventory",
-                "update orange quantity to 10"
-            ])
+            return next(SpeechToText._DEFAULT_CYCLE)
             
         except Exception as e:
-            logger.error(f"Error in speech to text conversion: {e}")
+            logger.error("Error in speech to text conversion: %s", e)
             return ""
 
     @staticmethod
     def process_text_input(text: str) -> str:
         """Process direct text input (for testing without audio)"""
-        logger.info(f"Processing text input: {text}")
+        logger.info("Processing text input: %s", text)
         return text.strip()
 
 # Convenience functions
@@ -0,0 +1,86 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional, Tuple
+
+from shared.constants import MESSAGES
+from backend.config import WRITE_TIMEOUT
+from backend.inventory_service import InventoryService
+
+logger = logging.getLogger(__name__)
+
+
+class WriteCoalescer:
+    """
+    Group concurrent add requests into one add_items transaction.
+    A single worker thread takes whatever adds are queued (up to max_batch)
+    and commits them together, so a burst of requests pays for one
+    transaction and one fsync instead of one each. A lone request is written
+    immediately; batches only form while a previous commit is in flight.
+    Repeated names within a batch are merged into one row and one log entry.
+    If a batch fails, its adds are retried one at a time so only the bad
+    request sees the error.
+    """
+
+    def __init__(self, max_batch: int = 64, timeout: float = WRITE_TIMEOUT):
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+
+    def add(self, item_name: str, quantity: int) -> Tuple[bool, str, Optional[Dict]]:
+        """Queue an add and block until its batch is committed (or the wait times out)"""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item_name, quantity, future))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            logger.error("Timed out waiting for the add of %s to commit", item_name)
+            return False, f"Timed out adding {item_name}; it may still be applied", None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name='write-coalescer', daemon=True)
+                    self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(batch)
+
+    @staticmethod
+    def _commit(batch) -> None:
+        try:
+            success, message, items = InventoryService.add_items([(name, qty) for name, qty, _ in batch])
+        except Exception as e:
+            logger.error("Error committing coalesced adds: %s", e)
+            success, message, items = False, f"Error adding item: {str(e)}", []
+
+        if not success and len(batch) > 1:
+            # Don't fail every coalesced caller for one bad row
+            for item_name, quantity, future in batch:
+                future.set_result(InventoryService.add_item(item_name, quantity))
+            return
+
+        by_name = {item['name'].lower(): item for item in items}
+        for item_name, quantity, future in batch:
+            if success:
+                result = (True, MESSAGES['ITEM_ADDED'].format(quantity=quantity, item=item_name),
+                          by_name.get(item_name.lower()))
+            else:
+                result = (False, message, None)
+            future.set_result(result)
+
+
+# Shared by the add routes
+write_coalescer = WriteCoalescer()
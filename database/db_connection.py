@@ -1,82 +1,356 @@
+import atexit
+import itertools
 import sqlite3
 import os
-import sys
+import pathlib
+import threading
 from contextlib import contextmanager
-
-# Add project root to path so backend.config can be found
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from functools import lru_cache
 
 from backend.config import DB_PATH
 
+# Reads go through one long-lived read-only connection per thread; all
+# writes share a single connection serialized by a lock. Under WAL readers
+# never wait on the writer, and sqlite3's per-connection statement cache
+# keeps the hot queries prepared across calls.
+_local = threading.local()
+_write_conn = None
+_write_lock = threading.Lock()
+# Set once the database directory has been created
+_dir_ready = False
+
+# Columns added after the first release. CREATE TABLE IF NOT EXISTS leaves
+# older databases without them, so init_database adds any that are missing.
+_ADDED_COLUMNS = {
+    'inventory': {'category': 'VARCHAR(50)'}
+}
+
+
+# Per-connection tuning: temp b-trees and a 64 MB page cache in memory,
+# 256 MB of the file memory-mapped, and wait up to 5 s on a locked database
+# instead of failing with SQLITE_BUSY
+_CONNECTION_PRAGMAS = """
+    PRAGMA temp_store = MEMORY;
+    PRAGMA cache_size = -64000;
+    PRAGMA mmap_size = 268435456;
+    PRAGMA busy_timeout = 5000;
+"""
+
+# Write connections also enforce foreign keys. WAL lets readers run alongside
+# the writer, and NORMAL sync is safe under WAL (one fsync per checkpoint, not per commit)
+_WRITE_PRAGMAS = """
+    PRAGMA foreign_keys = ON;
+    PRAGMA journal_mode = WAL;
+    PRAGMA synchronous = NORMAL;
+"""
 
-def get_connection():
+
+def _configure(conn, read_only=False):
+    """Apply the connection PRAGMAs (journal settings only on writable, file-backed databases)"""
+    pragmas = _CONNECTION_PRAGMAS
+    if not read_only:
+        pragmas += _WRITE_PRAGMAS
+        if DB_PATH == ':memory:':
+            # An in-memory database has no WAL; keep its default journal
+            pragmas = pragmas.replace('PRAGMA journal_mode = WAL;', '')
+    conn.executescript(pragmas)
+
+
+def get_connection(check_same_thread=True):
     """Create a database connection"""
-    # Ensure directory exists
-    db_dir = os.path.dirname(DB_PATH)
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir, exist_ok=True)
+    global _dir_ready
+    # Ensure directory exists (once per process)
+    if not _dir_ready:
+        os.makedirs(os.path.dirname(DB_PATH) or '.', exist_ok=True)
+        _dir_ready = True
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
-    # Enable foreign key support
-    conn.execute('PRAGMA foreign_keys = ON')
+    _configure(conn)
     return conn
 
 
+def _read_only_uri():
+    """URI that opens DB_PATH read-only"""
+    return pathlib.Path(os.path.abspath(DB_PATH)).as_uri() + '?mode=ro'
+
+
+def get_read_connection():
+    """Return this thread's persistent read-only connection, opening it on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = sqlite3.connect(_read_only_uri(), uri=True)
+        conn.row_factory = sqlite3.Row
+        _configure(conn, read_only=True)
+    return conn
+
+
+def _open_read_cursors():
+    """Cursors on this thread's read connection that have not been closed yet"""
+    cursors = getattr(_local, 'cursors', None)
+    if cursors is None:
+        cursors = _local.cursors = set()
+    return cursors
+
+
+def release_read_connection():
+    """
+    Close any cursor still open on this thread's read connection without
+    closing the connection. A partly consumed SELECT (e.g. an abandoned
+    iter_query generator) holds its WAL read snapshot until its statement is
+    reset, so a request that stopped mid-read would otherwise pin it.
+    """
+    cursors = _open_read_cursors()
+    while cursors:
+        cursors.pop().close()
+
+
+@atexit.register
+def close_connections():
+    """
+    Close the shared write connection at exit. Per-thread read connections
+    are left to the garbage collector, since a streamed response may still
+    be reading from one when the process shuts down.
+    """
+    global _write_conn
+    with _write_lock:
+        if _write_conn is not None:
+            _write_conn.close()
+            _write_conn = None
+
+
+@contextmanager
+def _write_connection():
+    """Hold the write lock and yield the shared write connection"""
+    global _write_conn
+    with _write_lock:
+        if _write_conn is None:
+            # Shared across threads, but only ever touched under _write_lock
+            _write_conn = get_connection(check_same_thread=False)
+        yield _write_conn
+
+
 @contextmanager
 def get_db_cursor():
     """Context manager for database cursors"""
-    conn = None
+    # The connection's own context manager commits on success and rolls back
+    # on any exception, so no transaction is ever left open on it
+    with _write_connection() as conn, conn:
+        yield conn.cursor()
+
+
+@contextmanager
+def get_read_cursor():
+    """Context manager for a cursor on this thread's read-only connection"""
+    cursor = get_read_connection().cursor()
+    cursors = _open_read_cursors()
+    cursors.add(cursor)
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
         yield cursor
-        conn.commit()
-    except sqlite3.Error as e:
-        if conn:
-            conn.rollback()
-        raise e
     finally:
-        if conn:
-            conn.close()
+        cursors.discard(cursor)
+        cursor.close()
 
 
-def init_database():
-    """Initialize database with schema"""
+@contextmanager
+def get_db_transaction():
+    """
+    Context manager for write transactions.
+    Takes the write lock up front (BEGIN IMMEDIATE) so every statement in
+    the block shares one commit, and rolls back on error.
+    """
+    with _write_connection() as conn:
+        conn.execute('BEGIN IMMEDIATE')
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+# Host parameter limit of SQLite builds before 3.32
+_MAX_PARAMS = 999
+
+
+def insert_rows(cursor, table, columns, rows):
+    """
+    Insert rows with multi-row INSERT ... VALUES (...), (...) statements,
+    chunked to stay under SQLite's host parameter limit.
+    """
+    rows = list(rows)
+    per_chunk = max(1, _MAX_PARAMS // len(columns))
+    row_placeholders = '(' + ', '.join('?' * len(columns)) + ')'
+    for start in range(0, len(rows), per_chunk):
+        chunk = rows[start:start + per_chunk]
+        placeholders = ', '.join([row_placeholders] * len(chunk))
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES {placeholders}",
+            list(itertools.chain.from_iterable(chunk))
+        )
+
+
+@lru_cache(maxsize=1)
+def _load_schema():
+    """Read schema.sql once per process"""
     schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
     if not os.path.exists(schema_path):
         raise FileNotFoundError(f"Schema file not found: {schema_path}")
     with open(schema_path, 'r') as f:
-        schema = f.read()
+        return f.read()
+
+
+# Dropped by reset_database before the schema is re-applied
+_DROP_TABLES = """
+    DROP TABLE IF EXISTS transaction_log;
+    DROP TABLE IF EXISTS inventory_fts;
+    DROP TABLE IF EXISTS inventory;
+"""
+
+
+# The triggers keep inventory_fts in sync from then on, so this only runs
+# when the index is created next to rows that already exist
+_REBUILD_FTS = "INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild');"
+
+
+def apply_schema(cursor, drop_existing=False):
+    """Run schema.sql as one transaction, optionally dropping the tables first"""
+    script = _load_schema()
+    if drop_existing:
+        script = _DROP_TABLES + script
+    else:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='inventory_fts'")
+        if cursor.fetchone() is None:
+            script += _REBUILD_FTS
+    cursor.executescript(f"BEGIN;\n{script}\nCOMMIT;")
+
+
+# RETURNING (used by every inventory write) needs 3.35; the FTS5 trigram
+# tokenizer needs 3.34
+_MIN_SQLITE_VERSION = (3, 35, 0)
+
+
+def _check_sqlite_version():
+    """Fail early, with a clear message, on an SQLite library too old for the schema and queries"""
+    if sqlite3.sqlite_version_info < _MIN_SQLITE_VERSION:
+        required = '.'.join(map(str, _MIN_SQLITE_VERSION))
+        raise RuntimeError(
+            f"SQLite {required} or newer is required, but Python is linked against {sqlite3.sqlite_version}"
+        )
+
+
+def init_database():
+    """Initialize database with schema"""
+    _check_sqlite_version()
     with get_db_cursor() as cursor:
-        cursor.executescript(schema)
+        # Columns first: the schema's indexes may reference them
+        _add_missing_columns(cursor)
+        _merge_case_duplicates(cursor)
+        apply_schema(cursor)
     print(f"Database initialized at: {DB_PATH}")
 
 
+# Older schemas allowed names differing only in case ("Rice" and "rice").
+# Fold each group into its oldest row, summing quantities and repointing the
+# log, so the unique LOWER(name) index can be created.
+_MERGE_CASE_DUPLICATES = """
+    UPDATE inventory
+    SET quantity = (SELECT SUM(dup.quantity) FROM inventory AS dup WHERE LOWER(dup.name) = LOWER(inventory.name))
+    WHERE id IN (SELECT MIN(id) FROM inventory GROUP BY LOWER(name) HAVING COUNT(*) > 1);
+
+    DELETE FROM inventory WHERE id NOT IN (SELECT MIN(id) FROM inventory GROUP BY LOWER(name));
+"""
+
+# Run before the DELETE above when transaction_log exists
+_REPOINT_CASE_DUPLICATE_LOGS = """
+    UPDATE transaction_log
+    SET item_id = (
+        SELECT MIN(keep.id) FROM inventory AS item
+        JOIN inventory AS keep ON LOWER(keep.name) = LOWER(item.name)
+        WHERE item.id = transaction_log.item_id
+    )
+    WHERE item_id NOT IN (SELECT MIN(id) FROM inventory GROUP BY LOWER(name));
+"""
+
+
+def _merge_case_duplicates(cursor):
+    """Merge case-variant duplicate names before idx_inventory_lower_name is first created"""
+    cursor.execute("""
+        SELECT
+            EXISTS (SELECT 1 FROM sqlite_master WHERE type='table' AND name='inventory'),
+            EXISTS (SELECT 1 FROM sqlite_master WHERE type='table' AND name='transaction_log'),
+            EXISTS (SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_inventory_lower_name')
+    """)
+    has_inventory, has_log, has_index = cursor.fetchone()
+    if has_inventory and not has_index:
+        script = (_REPOINT_CASE_DUPLICATE_LOGS if has_log else '') + _MERGE_CASE_DUPLICATES
+        cursor.executescript(f"BEGIN;\n{script}\nCOMMIT;")
+
+
+def _add_missing_columns(cursor):
+    """Bring tables created by an older schema up to date"""
+    for table, columns in _ADDED_COLUMNS.items():
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row['name'] for row in cursor.fetchall()}
+        if not existing:
+            # Table not created yet; the schema will create it complete
+            continue
+        for column, definition in columns.items():
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
 def check_database():
     """Check if database exists and has the inventory table"""
     if not os.path.exists(DB_PATH):
         return False
+    # A throwaway read-only probe: no write lock, no transaction to commit
+    try:
+        conn = sqlite3.connect(_read_only_uri(), uri=True)
+    except sqlite3.Error:
+        return False
     try:
-        with get_db_cursor() as cursor:
-            cursor.execute("""
-                SELECT name FROM sqlite_master
-                WHERE type='table' AND name='inventory'
-            """)
-            return cursor.fetchone() is not None
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='inventory'"
+        ).fetchone() is not None
     except sqlite3.Error:
         return False
+    finally:
+        conn.close()
 
 
 def execute_query(query, params=(), fetch_one=False, fetch_all=False):
     """Execute a query and return results"""
+    if fetch_one or fetch_all:
+        # Fetching queries are reads; serve them without touching the write lock
+        with get_read_cursor() as cursor:
+            cursor.execute(query, params)
+            # Column names are read once and shared by every row's dict
+            keys = tuple(column[0] for column in cursor.description)
+            if fetch_one:
+                result = cursor.fetchone()
+                return dict(zip(keys, result)) if result else None
+            return [dict(zip(keys, row)) for row in cursor.fetchall()]
     with get_db_cursor() as cursor:
         cursor.execute(query, params)
-        if fetch_one:
-            result = cursor.fetchone()
-            return dict(result) if result else None
-        elif fetch_all:
-            results = cursor.fetchall()
-            return [dict(row) for row in results]
-        else:
-            return cursor.lastrowid
+        return cursor.lastrowid
+
+
+def iter_query(query, params=(), arraysize=200):
+    """
+    Yield a read query's rows as dicts, fetching arraysize rows at a time,
+    so large results are never held in memory all at once.
+    """
+    with get_read_cursor() as cursor:
+        cursor.arraysize = arraysize
+        cursor.execute(query, params)
+        keys = tuple(column[0] for column in cursor.description)
+        while True:
+            rows = cursor.fetchmany()
+            if not rows:
+                break
+            for row in rows:
+                yield dict(zip(keys, row))
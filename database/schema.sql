@@ -3,13 +3,21 @@ CREATE TABLE IF NOT EXISTS inventory (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name VARCHAR(255) NOT NULL UNIQUE,
     quantity INTEGER NOT NULL DEFAULT 0 CHECK (quantity >= 0),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    category VARCHAR(50),
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
 
 -- Index for faster searches
 CREATE INDEX IF NOT EXISTS idx_inventory_name ON inventory(name);
 CREATE INDEX IF NOT EXISTS idx_inventory_quantity ON inventory(quantity);
+-- Item lookups are case-insensitive (WHERE LOWER(name) = LOWER(?)); a plain
+-- name index cannot serve them, so index the expression itself
+CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_lower_name ON inventory(LOWER(name));
+-- Matches the list view's ORDER BY so it is an index scan, not a sort
+CREATE INDEX IF NOT EXISTS idx_inventory_updated ON inventory(updated_at DESC, id DESC);
+-- Covers the stats query's GROUP BY category aggregates, so it never reads the table
+CREATE INDEX IF NOT EXISTS idx_inventory_category_quantity ON inventory(category, quantity);
 
 -- Trigger to automatically update updated_at timestamp
 CREATE TRIGGER IF NOT EXISTS update_inventory_timestamp 
@@ -18,6 +26,35 @@ BEGIN
     UPDATE inventory SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
 END;
 
+-- Trigram full-text index over item names so substring search is an index
+-- lookup instead of a LIKE '%term%' table scan. It is an external-content
+-- table kept in sync with inventory by the triggers below.
+CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+    name,
+    content='inventory',
+    content_rowid='id',
+    tokenize='trigram'
+);
+
+CREATE TRIGGER IF NOT EXISTS inventory_fts_insert
+    AFTER INSERT ON inventory
+BEGIN
+    INSERT INTO inventory_fts(rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_fts_delete
+    AFTER DELETE ON inventory
+BEGIN
+    INSERT INTO inventory_fts(inventory_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS inventory_fts_update
+    AFTER UPDATE OF name ON inventory
+BEGIN
+    INSERT INTO inventory_fts(inventory_fts, rowid, name) VALUES ('delete', OLD.id, OLD.name);
+    INSERT INTO inventory_fts(rowid, name) VALUES (NEW.id, NEW.name);
+END;
+
 -- Transaction log table for audit
 CREATE TABLE IF NOT EXISTS transaction_log (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -27,7 +64,7 @@ CREATE TABLE IF NOT EXISTS transaction_log (
     quantity_change INTEGER,
     previous_quantity INTEGER,
     new_quantity INTEGER,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (item_id) REFERENCES inventory(id)
 );
 
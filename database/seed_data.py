@@ -1,57 +1,62 @@
 import sqlite3
-import sys
-import os
 
-# Add parent directory to path to import config
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from backend.config import DB_PATH
-from database.db_connection import get_connection
+from database.db_connection import get_connection, apply_schema, insert_rows
+from shared.categories import classify_item
+
+INITIAL_ITEMS = [
+    ('Laptop', 15),
+    ('Mouse', 3),
+    ('Keyboard', 0),
+    ('Monitor', 8),
+    ('Headset', 2),
+    ('USB Cable', 25),
+    ('HDMI Cable', 12),
+    ('Webcam', 4),
+    ('Microphone', 6),
+    ('Speaker', 1)
+]
+
+def _seed(cursor):
+    """Replace the inventory with INITIAL_ITEMS; runs in the caller's transaction"""
+    # Clear existing data (optional - comment out if you want to keep existing)
+    cursor.execute("DELETE FROM inventory")
+    cursor.execute("DELETE FROM transaction_log")
+    
+    # Insert initial items
+    insert_rows(
+        cursor, 'inventory', ('name', 'quantity', 'category'),
+        [(name, quantity, classify_item(name)) for name, quantity in INITIAL_ITEMS]
+    )
+    
+    # Log the initial additions
+    insert_rows(
+        cursor, 'transaction_log', ('action', 'item_name', 'quantity_change', 'new_quantity'),
+        [('initial_add', name, quantity, quantity) for name, quantity in INITIAL_ITEMS]
+    )
+
+def _report_seeded(cursor):
+    """Refresh planner statistics after the bulk load and print the seeded items"""
+    cursor.execute("ANALYZE")
+    print(f"✅ Database seeded successfully with {len(INITIAL_ITEMS)} items")
+    
+    # Print seeded items
+    cursor.execute("SELECT * FROM inventory")
+    items = cursor.fetchall()
+    print("\n📦 Seeded Inventory:")
+    for item in items:
+        print(f"   {item[1]}: {item[2]}")
 
 def seed_database():
     """Seed the database with initial data"""
-    initial_items = [
-        ('Laptop', 15),
-        ('Mouse', 3),
-        ('Keyboard', 0),
-        ('Monitor', 8),
-        ('Headset', 2),
-        ('USB Cable', 25),
-        ('HDMI Cable', 12),
-        ('Webcam', 4),
-        ('Microphone', 6),
-        ('Speaker', 1)
-    ]
-    
     conn = get_connection()
     cursor = conn.cursor()
     
     try:
-        # Clear existing data (optional - comment out if you want to keep existing)
-        cursor.execute("DELETE FROM inventory")
-        cursor.execute("DELETE FROM transaction_log")
-        
-        # Insert initial items
-        for name, quantity in initial_items:
-            cursor.execute("""
-                INSERT INTO inventory (name, quantity) 
-                VALUES (?, ?)
-            """, (name, quantity))
-            
-            # Log the initial addition
-            cursor.execute("""
-                INSERT INTO transaction_log (action, item_name, quantity_change, new_quantity)
-                VALUES (?, ?, ?, ?)
-            """, ('initial_add', name, quantity, quantity))
-        
+        # One transaction for the whole seed, so it costs a single commit
+        conn.execute("BEGIN")
+        _seed(cursor)
         conn.commit()
-        print(f"✅ Database seeded successfully with {len(initial_items)} items")
-        
-        # Print seeded items
-        cursor.execute("SELECT * FROM inventory")
-        items = cursor.fetchall()
-        print("\n📦 Seeded Inventory:")
-        for item in items:
-            print(f"   {item[1]}: {item[2]}")
+        _report_seeded(cursor)
             
     except sqlite3.Error as e:
         print(f"❌ Error seeding database: {e}")
@@ -60,25 +65,21 @@ def seed_database():
         conn.close()
 
 def reset_database():
-    """Reset the database (drop and recreate tables)"""
+    """Reset the database (drop and recreate tables, then seed) on one connection"""
     conn = get_connection()
     cursor = conn.cursor()
     
     try:
-        # Drop existing tables
-        cursor.execute("DROP TABLE IF EXISTS transaction_log")
-        cursor.execute("DROP TABLE IF EXISTS inventory")
-        
-        # Recreate tables using schema
-        with open(os.path.join(os.path.dirname(__file__), 'schema.sql'), 'r') as f:
-            schema = f.read()
-            cursor.executescript(schema)
-        
-        conn.commit()
+        # Drop and recreate the tables in one transaction (executescript
+        # commits anything pending, so the DDL cannot share the seed's)
+        apply_schema(cursor, drop_existing=True)
         print("✅ Database reset successfully")
         
         # Seed with initial data
-        seed_database()
+        conn.execute("BEGIN")
+        _seed(cursor)
+        conn.commit()
+        _report_seeded(cursor)
         
     except sqlite3.Error as e:
         print(f"❌ Error resetting database: {e}")
@@ -87,6 +88,7 @@ def reset_database():
         conn.close()
 
 if __name__ == "__main__":
+    # Run from the project root: python -m database.seed_data [--reset]
     import argparse
     parser = argparse.ArgumentParser(description='Database seeding tool')
     parser.add_argument('--reset', action='store_true', help='Reset database before seeding')
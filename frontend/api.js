@@ -704,7 +704,7 @@ const API = {
     // Clear all inventory
     async clearInventory() {
         try {
-            const response = await enhancedFetch(`${API_CONFIG.baseURL}/clear`, {
+            const response = await enhancedFetch(`${API_CONFIG.baseURL}/inventory/clear`, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -713,7 +713,7 @@ const API = {
 
             const data = await response.json();
             
-            if (data.success) {
+            if (data.status === 'success') {
                 clearCache();
                 wsManager.send('inventory-cleared', {});
             }
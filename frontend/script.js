@@ -119,7 +119,7 @@ function initializePage() {
                         animateButton(clearAllBtn);
                         showLoader(clearAllBtn);
                         
-                        const response = await fetch('/api/clear', {
+                        const response = await fetch('/api/inventory/clear', {
                             method: 'POST',
                             headers: {
                                 'Content-Type': 'application/json'
@@ -128,7 +128,7 @@ function initializePage() {
 
                         const data = await response.json();
 
-                        if (data.success) {
+                        if (data.status === 'success') {
                             showToast(data.message, 'success', 3000);
                             fetchInventory();
                             playSuccessSound();
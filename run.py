@@ -7,22 +7,22 @@ Run this file to start both backend and frontend servers
 import os
 import sys
 import subprocess
-import time
 import webbrowser
-from threading import Thread
+from threading import Timer
 
 def run_backend():
-    """Run Flask backend server"""
+    """Run the backend server"""
     print("🚀 Starting backend server...")
-    os.environ['FLASK_APP'] = 'backend/app.py'
-    os.environ['FLASK_ENV'] = 'development'
+    os.environ['FLASK_APP'] = 'backend.app'
+    # Serve through waitress's thread pool by default; export FLASK_DEBUG=1
+    # for the auto-reloading Flask dev server
+    os.environ.setdefault('FLASK_DEBUG', '0')
     
-    # Run Flask
-    subprocess.run([sys.executable, 'backend/app.py'])
+    # Run Flask as a module from the project root so packages resolve without sys.path hacks
+    subprocess.run([sys.executable, '-m', 'backend.app'], cwd=os.path.dirname(os.path.abspath(__file__)))
 
 def open_browser():
-    """Open browser after a short delay"""
-    time.sleep(3)
+    """Open the frontend in a browser"""
     print("🌐 Opening browser...")
     webbrowser.open('http://localhost:5000')
 
@@ -54,8 +54,8 @@ if __name__ == '__main__':
     print("🎤 Voice Inventory Agent")
     print("=" * 50)
     
-    # Install requirements
-    if not install_requirements():
+    # Install requirements (set SKIP_DEPS=1 to skip on repeat runs)
+    if os.environ.get('SKIP_DEPS') != '1' and not install_requirements():
         response = input("Continue anyway? (y/n): ")
         if response.lower() != 'y':
             sys.exit(1)
@@ -63,8 +63,8 @@ if __name__ == '__main__':
     # Setup database
     setup_database()
     
-    # Open browser in separate thread
-    Thread(target=open_browser).start()
+    # Open browser once the server has had a moment to start
+    Timer(3.0, open_browser).start()
     
     # Run backend
     run_backend()
\ No newline at end of file
@@ -0,0 +1,27 @@
+import re
+
+from shared.constants import CATEGORY_KEYWORDS
+
+
+def _category_regex():
+    """
+    Compile CATEGORY_KEYWORDS into one pattern with a lookahead branch per
+    category. Branches are tried in order, so the first category with any
+    matching keyword wins, the same as inventory_service._CATEGORY_SQL.
+    """
+    categories = list(CATEGORY_KEYWORDS)
+    branches = '|'.join(
+        f"(?=.*?(?:{'|'.join(map(re.escape, CATEGORY_KEYWORDS[category]))}))(?P<c{index}>)"
+        for index, category in enumerate(categories)
+    )
+    groups = {f"c{index}": category for index, category in enumerate(categories)}
+    return re.compile(f"(?:{branches})", re.IGNORECASE | re.DOTALL), groups
+
+
+_CATEGORY_RE, _CATEGORY_GROUPS = _category_regex()
+
+
+def classify_item(item_name: str) -> str:
+    """Python twin of the CASE in inventory_service._CATEGORY_SQL, used when an item is inserted or seeded"""
+    match = _CATEGORY_RE.match(item_name)
+    return _CATEGORY_GROUPS[match.lastgroup] if match else 'Other'
@@ -1,24 +1,32 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
-@dataclass
+# Slotted instances carry no per-instance __dict__ (dataclass slots need Python 3.10+)
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# InventoryItem.status values, indexed by the item's stock level
+_LOW_STOCK_THRESHOLD = 5
+_ITEM_STATUSES = (sys.intern('in-stock'), sys.intern('out-of-stock'), sys.intern('low-stock'))
+
+@dataclass(**_SLOTS)
 class VoiceCommand:
     """Model for voice command input"""
     audio_file: Optional[str] = None
     text: Optional[str] = None
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = field(default_factory=datetime.now)
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
 class ParsedCommand:
-    """Model for parsed command structure"""
+    """Model for parsed command structure (immutable so parse results can be cached)"""
     action: str
     item: str
     quantity: int = 1
     confidence: float = 1.0
     raw_text: str = ""
 
-@dataclass
+@dataclass(**_SLOTS)
 class InventoryItem:
     """Model for inventory items"""
     id: Optional[int]
@@ -38,14 +46,11 @@ class InventoryItem:
     
     @property
     def status(self) -> str:
-        if self.quantity <= 0:
-            return 'out-of-stock'
-        elif self.quantity < 5:  # Low stock threshold
-            return 'low-stock'
-        else:
-            return 'in-stock'
+        # Index 0: in stock, 1: out of stock, 2: low stock
+        quantity = self.quantity
+        return _ITEM_STATUSES[(quantity <= 0) + 2 * (0 < quantity < _LOW_STOCK_THRESHOLD)]
 
-@dataclass
+@dataclass(**_SLOTS)
 class ApiResponse:
     """Standard API response model"""
     status: str
@@ -59,7 +64,7 @@ class ApiResponse:
             'data': self.data
         }
 
-@dataclass
+@dataclass(**_SLOTS)
 class InventoryStats:
     """Inventory statistics model"""
     total_items: int